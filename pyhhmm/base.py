@@ -174,13 +174,17 @@ class BaseHMM(object):
                 sample in the observation sequences
         :rtype: list
         """
+        # the log-parameters are the same for every sequence
+        log_pi = log_mask_zero(self.pi)
+        log_A = log_mask_zero(self.A)
+
         posteriors = []
         for obs_seq in obs_sequences:
             B_map = self._map_B(obs_seq)
             posteriors.append(
                 self._calc_gamma(
-                    self._calc_alpha(obs_seq, B_map),
-                    self._calc_beta(obs_seq, B_map),
+                    self._calc_alpha(obs_seq, B_map, log_pi, log_A),
+                    self._calc_beta(obs_seq, B_map, log_A),
                 )
             )
         return posteriors
@@ -207,13 +211,25 @@ class BaseHMM(object):
         if algorithm not in DECODER_ALGORITHMS:
             raise ValueError('Unknown decoder {!r}'.format(algorithm))
 
-        decoder = {'viterbi': self._decode_viterbi,
-                   'map': self._decode_map}[algorithm]
+        if algorithm == 'viterbi':
+            # the log-parameters are the same for every sequence
+            log_pi = log_mask_zero(self.pi)
+            log_A = log_mask_zero(self.A)
+            decoded = [
+                self._decode_viterbi(obs_seq, log_pi, log_A)
+                for obs_seq in obs_sequences
+            ]
+        else:
+            # predict_proba computes the log-parameters once for all sequences
+            decoded = [
+                self._decode_map(obs_seq, posteriors)
+                for obs_seq, posteriors in zip(
+                    obs_sequences, self.predict_proba(obs_sequences))
+            ]
 
         log_likelihood = 0.0
         state_sequences = []
-        for obs_seq in obs_sequences:
-            logL, state_seq = decoder(obs_seq)
+        for logL, state_seq in decoded:
             log_likelihood += logL
             state_sequences.append(state_seq)
 
@@ -382,29 +398,36 @@ class BaseHMM(object):
                     alpha=self.A_prior * np.ones(self.n_states), size=self.n_states
                 )
 
-    def _decode_map(self, obs_seq):
+    def _decode_map(self, obs_seq, posteriors=None):
         """Find the best state sequence (path) using MAP.
 
         :param obs_seq: an observation sequence 
         :type obs_seq: array_like
+        :param posteriors: array of shape (n_samples, n_states) containing the state-membership probabilities of obs_seq; computed with predict_proba if not given
+        :type posteriors: array_like, optional
         :return: state_sequence - the optimal path for the observation sequence
         :rtype:  array_like
         :return: log_likelihood - the maximum log-probability for the entire sequence
         :rtype: float
         """
-        posteriors = self.predict_proba([obs_seq])[0]
+        if posteriors is None:
+            posteriors = self.predict_proba([obs_seq])[0]
         log_likelihood = np.max(posteriors, axis=1).sum()
         state_sequence = np.argmax(posteriors, axis=1)
 
         return log_likelihood, state_sequence
 
-    def _decode_viterbi(self, obs_seq):
+    def _decode_viterbi(self, obs_seq, log_pi=None, log_A=None):
         """Find the best state sequence (path) using viterbi algorithm - a method
         of dynamic programming, very similar to the forward-backward algorithm,
         with the added step of maximisation and eventual backtracing.
 
         :param obs_seq: an observation sequence 
         :type obs_seq: array_like
+        :param log_pi: logarithm of the initial state distribution; computed from pi if not given
+        :type log_pi: array_like, optional
+        :param log_A: logarithm of the transition matrix; computed from A if not given
+        :type log_A: array_like, optional
         :return: state_sequence - the optimal path for the observation sequence
         :rtype:  array_like
         :return: log_likelihood - the maximum log-probability for the entire sequence
@@ -416,8 +439,10 @@ class BaseHMM(object):
         # we're using fresh data for the given obs_seq
         B_map = self._map_B(obs_seq)
 
-        log_pi = log_mask_zero(self.pi)
-        log_A = log_mask_zero(self.A)
+        if log_pi is None:
+            log_pi = log_mask_zero(self.pi)
+        if log_A is None:
+            log_A = log_mask_zero(self.A)
         log_B_map = log_mask_zero(B_map)
 
         # delta[t][i] = max(P[q1..qt=i,O1...Ot|model] - the path ending in Si and
@@ -449,13 +474,17 @@ class BaseHMM(object):
 
         return log_likelihood, state_sequence
 
-    def _calc_alpha(self, obs_seq, B_map):
+    def _calc_alpha(self, obs_seq, B_map, log_pi=None, log_A=None):
         """Calculates 'alpha' the forward variable given an observation sequence.
 
         :param obs_seq: an observation sequence 
         :type obs_seq: array_like
         :param B_map: mapping of the observations' mass/density Bj(Ot) to Bj(t)
         :type B_map: array_like, optional
+        :param log_pi: logarithm of the initial state distribution; computed from pi if not given
+        :type log_pi: array_like, optional
+        :param log_A: logarithm of the transition matrix; computed from A if not given
+        :type log_A: array_like, optional
         :return: array of shape (n_samples, n_states) containing the forward variables
         :rtype: array_like
         """
@@ -465,8 +494,10 @@ class BaseHMM(object):
         # alpha[t][i] = the probability of being in state 'i' after observing the
         # first t symbols.
         alpha = np.zeros((n_samples, self.n_states))
-        log_pi = log_mask_zero(self.pi)
-        log_A = log_mask_zero(self.A)
+        if log_pi is None:
+            log_pi = log_mask_zero(self.pi)
+        if log_A is None:
+            log_A = log_mask_zero(self.A)
         log_B_map = log_mask_zero(B_map)
 
         # init stage - alpha_1(i) = pi(i)b_i(o_1)
@@ -483,13 +514,15 @@ class BaseHMM(object):
 
         return alpha
 
-    def _calc_beta(self, obs_seq, B_map):
+    def _calc_beta(self, obs_seq, B_map, log_A=None):
         """Calculates 'beta', the backward variable for each observation sequence.
 
         :param obs_seq: an observation sequence 
         :type obs_seq: array_like
         :param B_map: mapping of the observations' mass/density Bj(Ot) to Bj(t)
         :type B_map: array_like, optional
+        :param log_A: logarithm of the transition matrix; computed from A if not given
+        :type log_A: array_like, optional
         :return: array of shape (n_samples, n_states) containing the backward variables
         :rtype: array_like
         """
@@ -500,7 +533,8 @@ class BaseHMM(object):
         # symbols from t+1 to the end (T).
         beta = np.zeros((n_samples, self.n_states))
 
-        log_A = log_mask_zero(self.A)
+        if log_A is None:
+            log_A = log_mask_zero(self.A)
         log_B_map = log_mask_zero(B_map)
 
         # init stage
@@ -519,7 +553,7 @@ class BaseHMM(object):
         return beta
 
     def _calc_xi(
-        self, obs_seq, B_map=None, alpha=None, beta=None
+        self, obs_seq, B_map=None, alpha=None, beta=None, log_A=None
     ):
         """Calculates 'xi', a joint probability from the 'alpha' and 'beta' variables.
 
@@ -531,15 +565,19 @@ class BaseHMM(object):
         :type alpha: array_like, optional
         :param beta: array of shape (n_samples, n_states) containing the backward variables
         :type beta: array_like, optional
+        :param log_A: logarithm of the transition matrix; computed from A if not given
+        :type log_A: array_like, optional
         :return: array of shape (n_samples, n_states, n_states) containing the a joint probability from the 'alpha' and 'beta' variables
         :rtype: array_like
         """
         if B_map is None:
             B_map = self._map_B(obs_seq)
+        if log_A is None:
+            log_A = log_mask_zero(self.A)
         if alpha is None:
-            alpha = self._calc_alpha(obs_seq, B_map)
+            alpha = self._calc_alpha(obs_seq, B_map, log_A=log_A)
         if beta is None:
-            beta = self._calc_beta(obs_seq, B_map)
+            beta = self._calc_beta(obs_seq, B_map, log_A)
 
         n_samples = len(obs_seq)
 
@@ -550,7 +588,6 @@ class BaseHMM(object):
         work_buffer = np.full((self.n_states, self.n_states), -np.inf)
 
         # compute the logarithm of the parameters
-        log_A = log_mask_zero(self.A)
         log_B_map = log_mask_zero(B_map)
         logprob = logsumexp(alpha[n_samples - 1])
 
@@ -766,10 +803,13 @@ class BaseHMM(object):
         :rtype: dict
         """
 
+        # the log-transition matrix is shared by alpha, beta and xi
+        log_A = log_mask_zero(self.A)
+
         # compute the parameters for the observation
         obs_stats = {
-            'alpha': self._calc_alpha(obs_seq, B_map),
-            'beta': self._calc_beta(obs_seq, B_map),
+            'alpha': self._calc_alpha(obs_seq, B_map, log_A=log_A),
+            'beta': self._calc_beta(obs_seq, B_map, log_A),
         }
 
         obs_stats['xi'] = self._calc_xi(
@@ -777,6 +817,7 @@ class BaseHMM(object):
             B_map=B_map,
             alpha=obs_stats['alpha'],
             beta=obs_stats['beta'],
+            log_A=log_A,
         )
         obs_stats['gamma'] = self._calc_gamma(
             obs_stats['alpha'], obs_stats['beta']
@@ -132,14 +132,11 @@ class TestGaussianHMM:
         X, state_sequences = h.sample(
             n_sequences=n_sequences, n_samples=n_samples, return_states=True)
 
-        assert np.all(X[i].ndim == 2 for i in range(n_sequences))
-        assert np.all(
-            len(X[i]) == len(state_sequences[i]) == n_samples
-            for i in range(n_sequences)
-        )
-        assert np.all(
-            len(np.unique(X[i])) == self.n_emissions for i in range(n_sequences)
-        )
+        assert all(x.ndim == 2 for x in X)
+        lengths = np.array([[len(X[i]), len(state_sequences[i])]
+                            for i in range(n_sequences)])
+        assert np.all(lengths == n_samples)
+        assert all(x.shape[1] == self.n_emissions for x in X)
 
     def test_train(self, n_samples=100, n_sequences=30, tr_params="stmc"):
         """
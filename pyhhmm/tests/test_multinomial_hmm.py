@@ -9,6 +9,8 @@ Parts of the code come from:
 """
 
 
+import os
+import copy
 import pytest
 import numpy as np
 
@@ -16,49 +18,95 @@ from heterogeneoushmm.multinomial import MultinomialHMM
 from hmmlearn.utils import normalize
 
 
+# number of processes for the parallel training tests; divide the cores between
+# the pytest-xdist workers (if any) to avoid oversubscription
+N_WORKERS = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", 1))
+N_PROCESSES = max(1, (os.cpu_count() or 1) // N_WORKERS)
+
+# (n_iter, conv_thresh) for the Baum-Welch runs of the training tests; the
+# log-likelihood plateaus within a few iterations on the sampled data
+TRAIN_SETTINGS = [(20, 1e-2)]
+
+PI = np.ascontiguousarray([0.6, 0.4], dtype=np.float64)
+A = np.ascontiguousarray([[0.7, 0.3], [0.4, 0.6]], dtype=np.float64)
+B = np.ascontiguousarray(
+    [[0.1, 0.4, 0.5], [0.6, 0.3, 0.1]], dtype=np.float64).reshape((1, 2, 3))
+
+
 class TestMultinomialHMM:
     """
     Test based on the example provided on:
         http://en.wikipedia.org/wiki/Hidden_Markov_model
     """
 
+    @pytest.fixture(scope="class")
+    def _prototype(self):
+        """
+        Construct the multinomial HMM with the example parameters once for the
+        whole class; the tests work on copies of it.
+        """
+        h = MultinomialHMM(2, 1, [3])
+        h.pi = np.array(PI, copy=True)
+        h.A = np.array(A, copy=True)
+        h.B = np.array(B, copy=True)
+        return h
+
+    @pytest.fixture(scope="class")
+    def sampled_X(self, _prototype):
+        """
+        Observation sequences shared by the training tests; the symbols are stored
+        as uint8 and the arrays are made read-only so that no test can alter them
+        for the others.
+        """
+        X = _prototype.sample(n_sequences=30, n_samples=100)
+        X = [x.astype(np.uint8, copy=False) for x in X]
+        for x in X:
+            x.flags.writeable = False
+        return X
+
+    @pytest.fixture
+    def rng(self):
+        """
+        Seeded random generator, so that the tests using it are deterministic
+        regardless of the order they run in.
+        """
+        return np.random.default_rng(0)
+
     @pytest.fixture(autouse=True)
-    def setup(self):
+    def setup(self, _prototype):
         """
         Initialise a multinomial HMM with some dummy values. 
         """
         self.n_states = 2
         self.n_emissions = 1
         self.n_features = [3]
-        self.h = MultinomialHMM(
-            self.n_states, self.n_emissions, self.n_features)
-        self.h.pi = np.array([0.6, 0.4])
-        self.h.A = np.array([[0.7, 0.3], [0.4, 0.6]])
-        self.h.B = np.array(
-            [[0.1, 0.4, 0.5], [0.6, 0.3, 0.1]]).reshape((1, 2, 3))
-
-    def test_score_samples(self):
+        self.h = copy.deepcopy(_prototype)
+
+    def test_score_samples(self, rng):
         """
-        Tests the score_samples method, which returns a list of arrays of shape
-        (n_samples, n_states) containing the state-membership probabilities for each
-        sample in the observation sequences. So we are testing if the return shape
-        is correct and if the posterior probabilities add up to 1.
+        Tests the score_samples method, which returns a list with the log-likelihood of
+        each observation sequence, and the predict_proba method, which returns a list of
+        arrays of shape (n_samples, n_states) containing the state-membership probabilities
+        for each sample in the observation sequences. So we are testing if the return shapes
+        are correct and if the posterior probabilities add up to 1.
+
+        :param rng: seeded random generator used to draw the observations
+        :type rng: np.random.Generator
         """
         idx = np.repeat(np.arange(self.n_states), 10)
         n_samples = len(idx)
-        X = [
-            np.random.randint(self.n_features[0], size=(n_samples, 1)) for _ in range(4)
-        ]
-
-        posteriors = self.h.score_samples(X)
-        assert np.any(
-            posteriors[i].shape == (n_samples, self.n_states)
-            for i in range(len(posteriors))
-        )
-        assert np.all(
-            np.allclose(posteriors[i].sum(axis=1), np.ones(n_samples))
-            for i in range(len(posteriors))
-        )
+        X_arr = rng.integers(
+            self.n_features[0], size=(4, n_samples, 1), dtype=np.int8)
+        X = list(X_arr)
+
+        log_likelihoods = np.asarray(self.h.score_samples(X))
+        assert log_likelihoods.shape == (len(X),)
+        assert np.all(np.isfinite(log_likelihoods))
+
+        posteriors = self.h.predict_proba(X)
+        assert all(p.shape == (n_samples, self.n_states) for p in posteriors)
+        sums = np.stack([p.sum(axis=1) for p in posteriors])
+        assert np.allclose(sums, 1.0)
 
     def test_decode_viterbi(self):
         """
@@ -82,6 +130,17 @@ class TestMultinomialHMM:
         _, state_sequence = self.h.decode(X, algorithm="map")
         assert np.allclose(state_sequence, [1, 0, 0])
 
+    def test_decode_viterbi_precomputed_logs(self):
+        """
+        Test if passing the log-parameters to the Viterbi decoder gives the same
+        result as computing them from pi and A.
+        """
+        obs_seq = [[0], [1], [2]]
+        log_likelihood, state_sequence = self.h._decode_viterbi(
+            obs_seq, log_pi=np.log(self.h.pi), log_A=np.log(self.h.A))
+        assert round(np.exp(log_likelihood), 5) == 0.01344
+        assert np.allclose(state_sequence, [1, 0, 0])
+
     def test_sample(self, n_samples=1000, n_sequences=5):
         """
         Test if the sampling method generates the correct number of 
@@ -94,50 +153,49 @@ class TestMultinomialHMM:
         """
         X, state_sequences = self.h.sample(
             n_sequences=n_sequences, n_samples=n_samples, return_states=True)
-        assert np.all(X[i].ndim == 2 for i in range(n_sequences))
-        assert np.all(
-            len(X[i]) == len(state_sequences[i]) == n_samples
-            for i in range(n_sequences)
-        )
-        for j in range(self.n_emissions):
-            assert np.all(
-                len(np.unique(X[i][:, j])) == self.n_features[j]
-                for i in range(n_sequences)
-            )
-
-    def test_train(self, n_samples=100, n_sequences=30, tr_params="ste"):
+        assert all(x.ndim == 2 for x in X)
+        lengths = np.array([[len(X[i]), len(state_sequences[i])]
+                            for i in range(n_sequences)])
+        assert np.all(lengths == n_samples)
+
+        # number of distinct symbols of each sequence and emission, from the
+        # changes along the sorted samples
+        X_sorted = np.sort(np.stack(X), axis=1)
+        n_unique = np.count_nonzero(np.diff(X_sorted, axis=1), axis=1) + 1
+        assert np.all(n_unique == self.n_features)
+
+    @pytest.mark.parametrize("n_iter,conv_thresh", TRAIN_SETTINGS)
+    def test_train(self, sampled_X, n_iter, conv_thresh, tr_params="ste"):
         """
         Test if the training algorithm works correctly (if the log-likelihood increases).
 
-        :param n_samples: number of samples to generate for each sequence, defaults to 100
-        :type n_samples: int, optional
-        :param n_sequences: number of sequences to generate, defaults to 30
-        :type n_sequences: int, optional
+        :param sampled_X: observation sequences sampled from the model (30 sequences of 100 samples)
+        :type sampled_X: list
+        :param n_iter: max number of Baum-Welch iterations
+        :type n_iter: int
+        :param conv_thresh: the threshold for the likelihood increase (convergence)
+        :type conv_thresh: float
         :param tr_params: which model parameters to train, defaults to "ste"
         :type tr_params: str, optional
         """
         h = self.h
         h.tr_params = tr_params
-        # Generate observation sequences
-        X = self.h.sample(n_sequences=n_sequences, n_samples=n_samples)
 
         # Mess up the parameters and see if we can re-learn them.
         _, log_likelihoods = h._train(
-            X, n_iter=100, conv_thresh=0.01, return_log_likelihoods=True
+            sampled_X, n_iter=n_iter, conv_thresh=conv_thresh, return_log_likelihoods=True
         )
 
         # we consider learning if the log_likelihood increases
         assert np.all(np.round(np.diff(log_likelihoods), 10) >= 0)
 
-    def test_train_without_init(self, n_samples=100, n_sequences=30, tr_params="ste"):
+    def test_train_without_init(self, sampled_X, tr_params="ste"):
         """
         Test if the training algorithm raises an error if it's run without initialising 
         the variables first.
 
-        :param n_samples: number of samples to generate for each sequence, defaults to 100
-        :type n_samples: int, optional
-        :param n_sequences: number of sequences to generate, defaults to 30
-        :type n_sequences: int, optional
+        :param sampled_X: observation sequences sampled from the model (30 sequences of 100 samples)
+        :type sampled_X: list
         :param tr_params: which model parameters to train, defaults to "ste"
         :type tr_params: str, optional
         """
@@ -145,55 +203,50 @@ class TestMultinomialHMM:
             self.n_states, self.n_emissions, self.n_features, tr_params=tr_params
         )
 
-        # Generate observation sequences
-        X = self.h.sample(n_sequences=n_sequences, n_samples=n_samples)
-
         with pytest.raises(AttributeError):
             h, _ = h._train(
-                X, n_iter=100, conv_thresh=0.01, return_log_likelihoods=True, no_init=True, n_processes=2
+                sampled_X, n_iter=100, conv_thresh=0.01, return_log_likelihoods=True, no_init=True, n_processes=N_PROCESSES
             )
 
-    def test_only_emission_train(self, n_samples=100, n_sequences=30, tr_params="e"):
+    @pytest.mark.parametrize("n_iter,conv_thresh", TRAIN_SETTINGS)
+    def test_only_emission_train(self, sampled_X, rng, n_iter, conv_thresh, tr_params="e"):
         """
         Test if the emission probabilities can be re-learnt. 
 
-        :param n_samples: number of samples to generate for each sequence, defaults to 100
-        :type n_samples: int, optional
-        :param n_sequences: number of sequences to generate, defaults to 30
-        :type n_sequences: int, optional
+        :param sampled_X: observation sequences sampled from the model (30 sequences of 100 samples)
+        :type sampled_X: list
+        :param rng: seeded random generator used to mess up the emission probabilities
+        :type rng: np.random.Generator
+        :param n_iter: max number of Baum-Welch iterations
+        :type n_iter: int
+        :param conv_thresh: the threshold for the likelihood increase (convergence)
+        :type conv_thresh: float
         :param tr_params: which model parameters to train, defaults to "e"
         :type tr_params: str, optional
         """
         h = self.h
         h.tr_params = tr_params
-        # Generate observation sequences
-        X = self.h.sample(n_sequences=n_sequences, n_samples=n_samples)
 
         # Mess up the emission probabilities and see if we can re-learn them.
-        h.B = np.asarray(
-            [
-                np.random.random((self.n_states, self.n_features[i]))
-                for i in range(self.n_emissions)
-            ]
-        )
+        h.B = [rng.random((self.n_states, f)) for f in self.n_features]
         for i in range(self.n_emissions):
             normalize(h.B[i], axis=1)
 
         h, log_likelihoods = h._train(
-            X, n_iter=100, conv_thresh=0.01, return_log_likelihoods=True, no_init=True
+            sampled_X, n_iter=n_iter, conv_thresh=conv_thresh, return_log_likelihoods=True, no_init=True
         )
 
         # we consider learning if the log_likelihood increases
         assert np.all(np.round(np.diff(log_likelihoods), 10) >= 0)
+        # and the random emission probabilities are clearly improved upon
+        assert log_likelihoods[-1] > log_likelihoods[0] + 1.0
 
-    def test_non_trainable_emission(self, n_samples=100, n_sequences=30, tr_params="ste"):
+    def test_non_trainable_emission(self, sampled_X, tr_params="ste"):
         """
         Test if the non-training of the last emission probabilities works.
 
-        :param n_samples: number of samples to generate for each sequence, defaults to 100
-        :type n_samples: int, optional
-        :param n_sequences: number of sequences to generate, defaults to 30
-        :type n_sequences: int, optional
+        :param sampled_X: observation sequences sampled from the model (30 sequences of 100 samples)
+        :type sampled_X: list
         :param tr_params: which model parameters to train, defaults to "e"
         :type tr_params: str, optional
         """
@@ -205,10 +258,6 @@ class TestMultinomialHMM:
             tr_params=tr_params,
         )
 
-        # Generate observation sequences
-        X = self.h.sample(
-            n_sequences=n_sequences, n_samples=n_samples)
-
         # Set up the emission probabilities and see if we can re-learn them.
         B_fix = np.asarray(
             [np.eye(self.n_states, self.n_features[i])
@@ -219,23 +268,19 @@ class TestMultinomialHMM:
 
         with pytest.raises(AttributeError):
             h, _ = h._train(
-                X, n_iter=10, conv_thresh=0.01, return_log_likelihoods=True, no_init=False
+                sampled_X, n_iter=10, conv_thresh=0.01, return_log_likelihoods=True, no_init=False
             )
 
             # we want that the emissions haven't changed
             assert np.allclose(B_fix, h.B)
 
-    def test_non_trainable_emission_not_set(
-        self, n_samples=100, n_sequences=30, tr_params="ste"
-    ):
+    def test_non_trainable_emission_not_set(self, sampled_X, tr_params="ste"):
         """
         Test whether an error is thrown if a non-trainaible emission probabilities are
         not initialised. 
 
-        :param n_samples: number of samples to generate for each sequence, defaults to 100
-        :type n_samples: int, optional
-        :param n_sequences: number of sequences to generate, defaults to 30
-        :type n_sequences: int, optional
+        :param sampled_X: observation sequences sampled from the model (30 sequences of 100 samples)
+        :type sampled_X: list
         :param tr_params: which model parameters to train, defaults to "e"
         :type tr_params: str, optional
         """
@@ -247,10 +292,7 @@ class TestMultinomialHMM:
             tr_params=tr_params,
         )
 
-        # Generate observation sequences
-        X = self.h.sample(n_sequences=n_sequences, n_samples=n_samples)
-
         with pytest.raises(AttributeError):
             h, _ = h._train(
-                X, n_iter=100, conv_thresh=0.01, return_log_likelihoods=True, no_init=True
+                sampled_X, n_iter=100, conv_thresh=0.01, return_log_likelihoods=True, no_init=True
             )
@@ -143,7 +143,7 @@ setup(
     # Similar to `install_requires` above, these must be valid existing
     # projects.
     extras_require={  # Optional
-        'test': ['pytest'],
+        'test': ['pytest', 'pytest-xdist'],
     },
 
     # List additional URLs that are relevant to your project as a dict.